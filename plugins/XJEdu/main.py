@@ -1,19 +1,66 @@
 import asyncio
+import bisect
+import heapq
 import json
 import os
 import re
 import sys
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+from urllib.parse import urljoin
 
 from astrbot.api.event import filter, AstrMessageEvent, MessageChain
 from astrbot.api.star import Context, Star, register
 from astrbot.api import logger
 
 try:
-    from bs4 import BeautifulSoup  # 已在 AstrBot 依赖中
+    from bs4 import BeautifulSoup, SoupStrainer  # 已在 AstrBot 依赖中
 except Exception:  # pragma: no cover
     BeautifulSoup = None
+    SoupStrainer = None
+
+try:
+    import soupsieve  # BeautifulSoup 的 CSS 选择器实现，随 bs4 安装
+except Exception:  # pragma: no cover
+    soupsieve = None
+
+try:
+    from lxml import html as lxml_html  # 可选依赖，C 实现的列表页解析
+except Exception:  # pragma: no cover
+    lxml_html = None
+
+# BeautifulSoup 解析器：有 lxml 时使用 C 实现的 lxml 构建器，否则退回内置 html.parser
+BS_PARSER = "lxml" if lxml_html is not None else "html.parser"
+
+# 列表项选择器预编译一次，解析时直接匹配，不再每次解析选择器字符串
+_LIST_ITEM_SELECTOR = soupsieve.compile("ul.list li") if soupsieve is not None else None
+# 详情页正文容器，按优先级排列：(标签, 属性条件)，供 soup.find 直接匹配
+_DETAIL_CONTAINERS = (
+    ("div", {"id": "ny-main"}), ("div", {"class": "ny"}), ("div", {"id": "vsb_content"}),
+    ("div", {"id": "vsb_content_2"}), ("div", {"id": "vsb_content_4"}), ("div", {"id": "vsb_content_5"}),
+    ("div", {"class": "article"}), ("div", {"class": "content"}), ("div", {"class": "news-content"}),
+)
+# 正文达到该长度即视为找到，不再检查后续容器
+DETAIL_ENOUGH_CHARS = 500
+# 解析阶段只保留上述容器；SoupStrainer 的属性条件是“且”关系，故 id 与 class 各建一个。
+# 每个都配一条对原始 HTML 的预检正则（宁可多报），页面里没有对应属性时跳过该次解析
+_DETAIL_PASSES = (
+    (
+        re.compile(r"""\bid\s*=\s*["']?(?:ny-main|vsb_content)""", re.IGNORECASE),
+        SoupStrainer("div", id=["ny-main", "vsb_content", "vsb_content_2", "vsb_content_4", "vsb_content_5"]),
+    ),
+    (
+        re.compile(r"""\bclass\s*=\s*["']?[^"'>]*\b(?:ny|article|content)\b""", re.IGNORECASE),
+        # 解析时 class 仍是原始字符串，用正则匹配其中的单个类名
+        SoupStrainer("div", class_=re.compile(r"(?:^|\s)(?:ny|article|content|news-content)(?:\s|$)")),
+    ),
+) if SoupStrainer is not None else ()
+
+try:
+    import orjson  # 可选依赖，更快的 JSON 编解码
+except Exception:  # pragma: no cover
+    orjson = None
 
 try:
     import aiohttp  # 已在 AstrBot 依赖中
@@ -26,12 +73,92 @@ except Exception:  # pragma: no cover
     async_playwright = None
 
 
+DUE_ROOT = "https://due.xjtu.edu.cn/"
 DUE_LIST_URL = "https://due.xjtu.edu.cn/jxxx/jxtz2.htm"
 DUE_LIST_EXTRA = [
     "https://due.xjtu.edu.cn/jxxx/jxtz2/jsap.htm",  # 竞赛安排子栏目
     "https://due.xjtu.edu.cn/jxxx/jxtz2/jsdc.htm",  # 竞赛大创子栏目
 ]
 STORE_PATH = os.path.join(os.path.dirname(__file__), "competitions_store.json")
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36"
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept-Language": "zh-CN,zh;q=0.9",
+}
+# 详情页抓取与 AI 解析的并发上限
+DETAIL_CONCURRENCY = 5
+# /comp list 最多展示的条数（按截止日期由近到远）
+LIST_MAX_ITEMS = 50
+# AI 调试记录：逐行追加 JSON，超过大小上限时仅保留最近若干条
+AI_DEBUG_PATH = os.path.join(os.path.dirname(__file__), "ai_last_response.jsonl")
+AI_DEBUG_MAX_BYTES = 2 * 1024 * 1024
+AI_DEBUG_KEEP = 200
+# 发送给 AI 的正文上限（字符数）
+AI_TEXT_MAX_CHARS = 8000
+# AI 请求：分段超时 + 一次重试，响应体上限防止异常大包占用内存
+AI_TIMEOUT = aiohttp.ClientTimeout(total=30, sock_connect=5, sock_read=25) if aiohttp else None
+AI_ATTEMPTS = 2
+AI_MAX_RESP_BYTES = 1024 * 1024
+
+
+# 同时匹配 2025年3月1日 与 2025-03-01 / 2025.3.1 / 2025/3/1，直接捕获年月日数字
+_DATE_ANY_RE = re.compile(r"(\d{4})(?:年|[./-])(\d{1,2})(?:月|[./-])(\d{1,2})日?")
+_QQ_GROUP_RES = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"QQ群[号]?[：: ]?(\d{5,12})",
+        r"QQ[：: ]?(\d{5,12})",
+        r"群号[：: ]?(\d{5,12})",
+    )
+]
+
+
+def _keyword_re(keywords) -> "re.Pattern[str]":
+    """把关键词编译成一个交替正则，仅用于判断是否命中任一关键词。
+
+    包含其他关键词的长词（如“报名截止”含“报名”）命中时短词必然命中，可直接去掉，
+    减少每个位置上要尝试的分支。
+    """
+    kws = set(keywords)
+    kept = sorted(k for k in kws if not any(o != k and o in k for o in kws))
+    return re.compile("|".join(map(re.escape, kept)))
+
+
+_REG_KW_RE = _keyword_re([
+    "报名", "报名通知", "报名开始", "报名截止", "报名链接", "参赛", "竞赛报名",
+    "竞赛安排", "赛事安排", "竞赛通知"
+])
+# 非空白行：捕获去掉行尾空白后的内容（[^\S\n] 为不含换行的空白，避免跨行匹配）
+_PERSONA_LINE_RE = re.compile(r"(?m)^(?=[^\S\n]*\S)(.*?)[^\S\n]*$")
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+_INLINE_WS_RE = re.compile(r"[ \t\u3000\xa0]+")
+# lxml 不接受带 encoding 声明的 str 输入；文本已解码，解析前去掉开头的 XML 声明
+_XML_DECL_RE = re.compile(r"^\ufeff?\s*<\?xml[^>]*\?>")
+# 报名摘要：日期行与关键词
+_SNIPPET_DATE_RE = re.compile(r"\d{4}[年./-]\d{1,2}[月./-]\d{1,2}")
+_SNIPPET_INCLUDE_KW = (
+    "报名", "报名通知", "报名开始", "报名截止", "参赛", "竞赛", "安排", "截止时间", "开始时间", "报名时间", "发布日期", "发布"
+)
+_SNIPPET_DISCARD_KW = (
+    "当前位置", "上一篇", "下一篇", "打印", "分享", "返回", "阅读", "浏览次数", "来源", "作者"
+)
+# 每组关键词合成一个交替正则，一次扫描代替逐个子串查找
+_SNIPPET_INCLUDE_RE = _keyword_re(_SNIPPET_INCLUDE_KW)
+_SNIPPET_DISCARD_RE = _keyword_re(_SNIPPET_DISCARD_KW)
+# 候选行定位：报名关键词或日期，在全文上直接搜索，命中后再扩展到所在行
+_SNIPPET_HIT_RE = re.compile(f"{_SNIPPET_INCLUDE_RE.pattern}|{_SNIPPET_DATE_RE.pattern}")
+# 列表标题过滤，放宽到含 竞赛/比赛/报名/竞赛大创/竞赛安排
+_LIST_TITLE_KW = ("竞赛", "比赛", "报名", "大创", "赛")
+_LIST_TITLE_RE = _keyword_re(_LIST_TITLE_KW)
+# 日期区间连接符：两个日期之间仅隔“至/—/~”等
+_RANGE_SEP_RE = re.compile(r"\s*[—–\-~～至到]{1,2}\s*")
+# 时间标签：(候选标签, 对应字段)，靠后的规则覆盖靠前的结果
+_TIME_LABELS = (
+    (("开始时间", "开始日期"), "start"),
+    (("截止时间", "截止日期"), "end"),
+    (("报名时间", "报名日期", "报名开始时间", "报名开始日期"), "start"),
+    (("报名截止",), "end"),
+)
 
 
 def _now() -> datetime:
@@ -39,92 +166,181 @@ def _now() -> datetime:
 
 
 def _parse_date(date_str: str) -> Optional[datetime]:
-    date_str = date_str.strip()
     date_str = date_str.replace("—", "-").replace("–", "-").replace("至", "-").replace("~", "-").replace("～", "-")
-    patterns = [
-        "%Y年%m月%d日",
-        "%Y-%m-%d",
-        "%Y/%m/%d",
-        "%Y.%m.%d",
-    ]
-    for p in patterns:
-        try:
-            return datetime.strptime(date_str, p)
-        except Exception:
-            pass
-    # 中文带时分的简单处理
-    m = re.search(r"(\d{4})年(\d{1,2})月(\d{1,2})日", date_str)
-    if m:
-        try:
-            y, mo, d = int(m.group(1)), int(m.group(2)), int(m.group(3))
-            return datetime(y, mo, d)
-        except Exception:
-            return None
-    m2 = re.search(r"(\d{4})[./-](\d{1,2})[./-](\d{1,2})", date_str)
-    if m2:
-        try:
-            y, mo, d = int(m2.group(1)), int(m2.group(2)), int(m2.group(3))
-            return datetime(y, mo, d)
-        except Exception:
-            return None
-    return None
+    m = _DATE_ANY_RE.search(date_str)
+    if not m:
+        return None
+    try:
+        return datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    except ValueError:
+        return None
 
 
 def _extract_qq_group(text: str) -> Optional[str]:
-    patterns = [
-        r"QQ群[号]?[：: ]?(\d{5,12})",
-        r"QQ[：: ]?(\d{5,12})",
-        r"群号[：: ]?(\d{5,12})",
-    ]
-    for pat in patterns:
-        m = re.search(pat, text, flags=re.IGNORECASE)
+    for pat in _QQ_GROUP_RES:
+        m = pat.search(text)
         if m:
             return m.group(1)
     return None
 
 
+def _end_date_key(comp: Dict[str, Any]) -> str:
+    # ISO 日期字符串可直接按字典序比较；无截止日期的排在最后
+    return comp.get("end_date") or "9999-12-31"
+
+
 def _is_registration(title: str, body: str) -> bool:
-    kw = [
-        "报名", "报名通知", "报名开始", "报名截止", "报名链接", "参赛", "竞赛报名",
-        "竞赛安排", "赛事安排", "竞赛通知"
-    ]
-    text = f"{title}\n{body}"
-    return any(k in text for k in kw)
+    return bool(_REG_KW_RE.search(title) or _REG_KW_RE.search(body))
+
+
+def _json_loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """序列化为 UTF-8 字节；有 orjson 时使用 orjson，否则退回标准库。"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+# 以下文件读写均为同步实现，由协程通过 asyncio.to_thread 调用，避免阻塞事件循环
+def _read_json(path: str) -> Any:
+    with open(path, "rb") as f:
+        return _json_loads(f.read())
+
+
+def _write_json(path: str, data: Any):
+    with open(path, "wb") as f:
+        f.write(_json_dumps(data, indent=True))
+
+
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def _write_text(path: str, text: str):
+    with open(path, "w", encoding="utf-8", errors="ignore") as f:
+        f.write(text)
+
+
+# 详情并发时会有多个线程同时追加/截断调试日志，需串行化
+_AI_DEBUG_LOCK = threading.Lock()
+
+
+def _append_ai_debug(record: Dict[str, Any]):
+    with _AI_DEBUG_LOCK:
+        with open(AI_DEBUG_PATH, "ab") as f:
+            f.write(_json_dumps(record) + b"\n")
+        if os.path.getsize(AI_DEBUG_PATH) > AI_DEBUG_MAX_BYTES:
+            with open(AI_DEBUG_PATH, "rb") as f:
+                lines = f.readlines()[-AI_DEBUG_KEEP:]
+            with open(AI_DEBUG_PATH, "wb") as f:
+                f.writelines(lines)
+
+
+def _read_ai_debug_last_line() -> str:
+    """从文件末尾向前分块读取，只取最后一条记录，不读入整个调试日志。"""
+    with _AI_DEBUG_LOCK:
+        with open(AI_DEBUG_PATH, "rb") as f:
+            pos = f.seek(0, os.SEEK_END)
+            tail = b""
+            while pos > 0:
+                step = min(4096, pos)
+                pos -= step
+                f.seek(pos)
+                tail = f.read(step) + tail
+                # 末尾换行之前再出现换行，说明最后一行已完整
+                if b"\n" in tail.rstrip(b"\n"):
+                    break
+    return tail.rstrip(b"\n").rsplit(b"\n", 1)[-1].decode("utf-8", errors="ignore")
+
+
+# AI 输入落盘同样来自并发线程；串行写入，文件中始终是某一次请求的完整内容
+_AI_INPUT_LOCK = threading.Lock()
+
+
+def _write_ai_input(path: str, text: str):
+    with _AI_INPUT_LOCK:
+        _write_text(path, text)
+
+
+def _persona_line(m: "re.Match") -> str:
+    line = m.group(1)
+    # 已带有口癖则不重复追加
+    if line.endswith(("喵～", "喵~")):
+        return line
+    return line + "喵～"
+
+
+def _decode_html(raw: bytes, declared: Optional[str] = None) -> str:
+    """按响应头声明的编码解码；未声明时读取页面头部的 <meta charset>，都没有则按 UTF-8。"""
+    charset = declared
+    if not charset:
+        m = _META_CHARSET_RE.search(raw[:4096])
+        charset = m.group(1).decode("ascii") if m else "utf-8"
+    try:
+        return raw.decode(charset, errors="ignore")
+    except LookupError:
+        return raw.decode("utf-8", errors="ignore")
+
+
+def _compact_text(text: str) -> str:
+    """合并行内连续空白并去掉空行。"""
+    lines = (_INLINE_WS_RE.sub(" ", ln).strip() for ln in (text or "").splitlines())
+    return "\n".join(ln for ln in lines if ln)
+
+
+def _date_tokens(body: str) -> List[tuple]:
+    """扫描正文中的全部日期，返回 (起始位置, 结束位置, datetime) 列表。"""
+    tokens: List[tuple] = []
+    for m in _DATE_ANY_RE.finditer(body):
+        try:
+            dt = datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        except ValueError:
+            continue
+        tokens.append((m.start(), m.end(), dt))
+    return tokens
 
 
 def _extract_time_window(body: str) -> Dict[str, Optional[datetime]]:
     res: Dict[str, Optional[datetime]] = {"start": None, "end": None}
-    range_pat = re.search(r"(\d{4}[年./-]\d{1,2}[月./-]\d{1,2})\s*[—–\-~～至到]{1,2}\s*(\d{4}[年./-]\d{1,2}[月./-]\d{1,2})", body)
-    if range_pat:
-        s_dt = _parse_date(range_pat.group(1))
-        e_dt = _parse_date(range_pat.group(2))
-        if s_dt:
-            res["start"] = s_dt
-        if e_dt:
-            res["end"] = e_dt
-    # 尝试从“开始时间/截止时间/报名时间”行中提取
-    pairs = [
-        (r"开始(?:时间|日期)[：: ]*(.+)", "start"),
-        (r"截止(?:时间|日期)[：: ]*(.+)", "end"),
-        (r"报名(?:开始)?(?:时间|日期)[：: ]*(.+)", "start"),
-        (r"报名截止(?:时间|日期)?[：: ]*(.+)", "end"),
-    ]
-    for pat, key in pairs:
-        m = re.search(pat, body)
-        if m:
-            dt = _parse_date(m.group(1))
-            if dt:
-                res[key] = dt
-
-    # 若无行匹配，尝试抓取段落中的两个日期，以第一个当 start，最后一个当 end
-    dates = re.findall(r"\d{4}[./-]\d{1,2}[./-]\d{1,2}|\d{4}年\d{1,2}月\d{1,2}日", body)
-    parsed = [d for d in (_parse_date(s) for s in dates) if d]
-    if parsed:
-        parsed.sort()
-        if res["start"] is None:
-            res["start"] = parsed[0]
-        if res["end"] is None:
-            res["end"] = parsed[-1]
+    # 仅扫描一次正文，之后按日期位置判断区间与标签
+    tokens = _date_tokens(body)
+    if not tokens:
+        return res
+    # 区间：相邻两个日期之间只有连接符
+    for (_, e0, d0), (s1, _, d1) in zip(tokens, tokens[1:]):
+        if _RANGE_SEP_RE.fullmatch(body, e0, s1):
+            res["start"], res["end"] = d0, d1
+            break
+    # 尝试从“开始时间/截止时间/报名时间”行中提取：取标签后同一行内的第一个日期
+    positions = [t[0] for t in tokens]
+    for labels, key in _TIME_LABELS:
+        hit = -1
+        hit_end = -1
+        for lb in labels:
+            i = body.find(lb)
+            if i >= 0 and (hit < 0 or i < hit):
+                hit, hit_end = i, i + len(lb)
+        if hit < 0:
+            continue
+        line_end = body.find("\n", hit_end)
+        if line_end < 0:
+            line_end = len(body)
+        idx = bisect.bisect_left(positions, hit_end)
+        if idx < len(tokens) and positions[idx] < line_end:
+            res[key] = tokens[idx][2]
+
+    # 若无行匹配，以段落中最早的日期当 start，最晚的当 end
+    if res["start"] is None:
+        res["start"] = min(t[2] for t in tokens)
+    if res["end"] is None:
+        res["end"] = max(t[2] for t in tokens)
     return res
 
 
@@ -136,25 +352,32 @@ class XJEduPlugin(Star):
         self._check_task: Optional[asyncio.Task] = None
         self._remind_task: Optional[asyncio.Task] = None
         self.ai_conf: Dict[str, Any] = {}
+        # AI 开关与请求参数缓存，避免每条通知都读 KV 与配置字典
+        self._ai_enabled_cached: Optional[bool] = None
+        self._ai_api_key: str = ""
+        self._ai_base_url: str = ""
+        self._ai_model: str = ""
+        self._ai_url: str = ""
+        self._ai_headers: Dict[str, str] = {}
         self.store_loaded = False
+        # KV 数据的内存副本：启动时读取一次，周期内只改内存，结束时统一回写
+        self._state: Dict[str, Any] = {}
+        self._state_loaded = False
         self._challenge_warned = False
         self._render_dumped = False
+        self._ai_input_logged = False
+        # 共享 HTTP 会话：列表页、详情页与 AI 请求复用连接池
+        self._http: Optional["aiohttp.ClientSession"] = None
+        # Playwright 浏览器常驻复用，避免每次兜底渲染都冷启动 Chromium
+        self._pw = None
+        self._browser = None
+        self._browser_ctx = None
+        self._browser_proxy: Optional[str] = None
+        self._browser_lock = asyncio.Lock()
 
     def _persona_wrap(self, text: str) -> str:
         """将输出文本按内向猫娘口癖进行包装，仅影响聊天输出，不改动日志与文件。"""
-        lines = (text or "").splitlines()
-        wrapped: List[str] = []
-        for ln in lines:
-            s = ln.rstrip()
-            if not s:
-                wrapped.append(ln)
-                continue
-            # 已带有口癖则不重复追加
-            if s.endswith("喵～") or s.endswith("喵~"):
-                wrapped.append(s)
-            else:
-                wrapped.append(s + "喵～")
-        return "\n".join(wrapped)
+        return _PERSONA_LINE_RE.sub(_persona_line, text or "")
 
     async def initialize(self):
         # 读取 AI 配置
@@ -163,8 +386,11 @@ class XJEduPlugin(Star):
         # 初始化 AI 开关（KV 未设定则采用配置默认值）
         if (await self.get_kv_data("ai_use", None)) is None:
             await self._save_kv("ai_use", bool(self.ai_conf.get("use_ai", False)))
+        await self._refresh_ai_enabled()
+        self._get_http()
         # 先尝试从外置文件恢复历史知识库，减少二次拉取；初始化同步改为手动指令触发
         await self._load_store_file()
+        await self._load_state()
         # 启动定时任务：每30分钟拉取一次；每日提醒一次
         self._check_task = asyncio.create_task(self._periodic_check_loop(interval_sec=1800))
         self._remind_task = asyncio.create_task(self._daily_deadline_remind_loop(hour=9))
@@ -176,8 +402,25 @@ class XJEduPlugin(Star):
         for t in [self._check_task, self._remind_task]:
             if t and not t.done():
                 t.cancel()
+        if self._http and not self._http.closed:
+            await self._http.close()
+        self._http = None
+        await self._close_browser()
+        if self._state_loaded:
+            await self._flush_state()
         logger.info("[XJEdu] 竞赛监控插件已停止")
 
+    def _get_http(self) -> Optional["aiohttp.ClientSession"]:
+        # 惰性创建共享会话，已关闭时重建
+        if not aiohttp:
+            return None
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                headers=DEFAULT_HEADERS,
+                connector=aiohttp.TCPConnector(limit=10, ttl_dns_cache=300),
+            )
+        return self._http
+
     async def _stop_check_task(self):
         # 仅停止当前正在运行的检查任务，不影响后续定时调度
         if self._check_task and not self._check_task.done():
@@ -192,8 +435,7 @@ class XJEduPlugin(Star):
             # 独立配置文件：plugins/XJEdu/config_ai.json
             conf_path = os.path.join(os.path.dirname(__file__), "config_ai.json")
             if os.path.exists(conf_path):
-                with open(conf_path, "r", encoding="utf-8") as f:
-                    self.ai_conf = json.load(f)
+                self.ai_conf = await asyncio.to_thread(_read_json, conf_path)
             else:
                 self.ai_conf = {
                     "use_ai": True,
@@ -205,6 +447,19 @@ class XJEduPlugin(Star):
         except Exception as e:
             logger.warning(f"[XJEdu] 读取AI配置失败: {e}")
             self.ai_conf = {"use_ai": True}
+        self._apply_ai_config()
+
+    def _apply_ai_config(self):
+        # 配置加载后一次性计算请求地址与请求头
+        conf = self.ai_conf or {}
+        self._ai_api_key = conf.get("api_key") or ""
+        self._ai_base_url = conf.get("base_url", "https://api.deepseek.com").rstrip("/")
+        self._ai_model = conf.get("model", "deepseek-chat")
+        self._ai_url = f"{self._ai_base_url}/chat/completions"
+        self._ai_headers = {
+            "Authorization": f"Bearer {self._ai_api_key}",
+            "Content-Type": "application/json",
+        }
 
     async def _get_kv(self, key: str, default: Any):
         v = await self.get_kv_data(key, default)
@@ -213,25 +468,33 @@ class XJEduPlugin(Star):
     async def _save_kv(self, key: str, value: Any):
         await self.put_kv_data(key, value)
 
-    async def _is_ai_enabled(self) -> bool:
+    async def _refresh_ai_enabled(self) -> bool:
         flag = await self._get_kv("ai_use", None)
         if flag is None:
-            return bool(self.ai_conf.get("use_ai", False))
-        return bool(flag)
+            flag = self.ai_conf.get("use_ai", False)
+        self._ai_enabled_cached = bool(flag)
+        return self._ai_enabled_cached
+
+    async def _is_ai_enabled(self) -> bool:
+        if self._ai_enabled_cached is None:
+            return await self._refresh_ai_enabled()
+        return self._ai_enabled_cached
 
     async def _ai_extract_competition(self, title: str, body: str, raw_html: Optional[str] = None) -> Optional[Dict[str, Any]]:
         if not await self._is_ai_enabled():
             return None
+        # 本地预筛：既无报名关键词也无任何日期的通知，不必请求 AI
+        if not _is_registration(title, body) and not _DATE_ANY_RE.search(body):
+            return {"is_registration": False, "start_date": None, "end_date": None}
         if not aiohttp:
             logger.warning("[XJEdu] AI 解析需要 aiohttp，可选安装后再试")
             return None
-        api_key = (self.ai_conf or {}).get("api_key")
-        if not api_key:
+        if not self._ai_api_key:
             logger.warning("[XJEdu] AI 解析未配置 api_key，已跳过")
             return None
-        base_url = (self.ai_conf or {}).get("base_url", "https://api.deepseek.com").rstrip("/")
-        model = (self.ai_conf or {}).get("model", "deepseek-chat")
-        url = f"{base_url}/chat/completions"
+        base_url = self._ai_base_url
+        model = self._ai_model
+        url = self._ai_url
         prompt_text = (
             "请严格按以下要求提取：\n"
             "- 判断是否为竞赛报名/参赛通知；\n"
@@ -246,38 +509,43 @@ class XJEduPlugin(Star):
         # 若检测到动态验证页面，避免将其发给 AI
         if raw_html and ("dynamic_challenge" in raw_html or "安全检查" in raw_html):
             raw_html = None
-        # 优先使用整页 HTML（不截断），并落盘供检查；无 HTML 时退回正文片段
-        if raw_html:
+        # 优先发送正文容器的纯文本；超长时截断并附上含日期/报名信息的句子
+        main_text = _compact_text(body)
+        if main_text:
+            lines = [f"标题：{title}", "正文（纯文本）："]
+            if len(main_text) <= AI_TEXT_MAX_CHARS:
+                lines.append(main_text)
+            else:
+                lines.append(main_text[:AI_TEXT_MAX_CHARS])
+                lines.append("正文中含日期/报名信息的句子：")
+                lines.append(self._extract_relevant_snippet(main_text))
+            user_content = "\n".join([prompt_text] + lines)
+        # 正文抽取为空时才退回整页 HTML，并落盘供检查
+        elif raw_html:
             lines = [f"标题：{title}"]
             lines.append("网页HTML全文（未截断）：")
             lines.append(raw_html)
             user_content = "\n".join([prompt_text] + lines)
             dump_path = os.path.join(os.path.dirname(__file__), "ai_input_last.html")
             try:
-                with open(dump_path, "w", encoding="utf-8", errors="ignore") as f:
-                    f.write(raw_html)
+                await asyncio.to_thread(_write_ai_input, dump_path, raw_html)
             except Exception as dump_err:
                 logger.warning(f"[XJEdu] 保存 AI 输入HTML失败: {dump_err}")
         else:
-            try:
-                snippet = self._extract_relevant_snippet(body)
-                lines = [f"标题：{title}"]
-                lines.append("正文片段（纯文本）：")
-                lines.append(snippet)
-                user_content = "\n".join([prompt_text] + lines)
-            except Exception:
-                user_content = f"{prompt_text}\n标题：{title}\n正文（纯文本）：\n{body[:4000]}"
-        # 保存发送给 AI 的原文，并在日志中提示路径
+            user_content = f"{prompt_text}\n标题：{title}"
+        # 保存发送给 AI 的原文（仅保留最近一次），路径只在首次保存时提示
         input_path = os.path.join(os.path.dirname(__file__), "ai_input_last.txt")
         try:
-            with open(input_path, "w", encoding="utf-8", errors="ignore") as f:
-                f.write(user_content)
-            logger.warning(f"[XJEdu] AI 输入已保存 {input_path}")
+            await asyncio.to_thread(_write_ai_input, input_path, user_content)
+            if not self._ai_input_logged:
+                logger.warning(f"[XJEdu] AI 输入已保存 {input_path}")
+                self._ai_input_logged = True
         except Exception as dump_err:
             logger.warning(f"[XJEdu] 保存 AI 输入失败: {dump_err}")
         payload = {
             "model": model,
             "temperature": 0,
+            "stream": False,
             "messages": [
                 {"role": "system", "content": "你是信息抽取助手，严格按用户消息中的要求输出 JSON。"},
                 {"role": "user", "content": user_content},
@@ -289,55 +557,40 @@ class XJEduPlugin(Star):
                 payload["reasoning"] = {"effort": "medium"}
         except Exception:
             pass
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        }
         try:
-            async with aiohttp.ClientSession(headers=headers) as sess:
-                async with sess.post(url, json=payload, timeout=60) as resp:
-                    if resp.status != 200:
-                        try:
-                            resp_text = await resp.text(errors="ignore")
-                        except Exception:
-                            resp_text = ""
-                        logger.warning(f"[XJEdu] AI 解析失败 status={resp.status} url={url} resp={resp_text[:300]}")
-                        return None
-                    data = await resp.json()
+            for attempt in range(AI_ATTEMPTS):
+                try:
+                    raw = await self._post_ai(url, payload)
+                    break
+                except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                    if attempt + 1 >= AI_ATTEMPTS:
+                        raise
+                    delay = 1 << attempt
+                    logger.warning(f"[XJEdu] AI 请求超时或连接异常，{delay}s 后重试: {type(e).__name__}: {e}")
+                    await asyncio.sleep(delay)
+            if raw is None:
+                return None
+            data = _json_loads(raw)
             content = (((data.get("choices") or [{}])[0]).get("message") or {}).get("content") or ""
             # 调试阶段：保存与输出原始回复
-            debug_path = os.path.join(os.path.dirname(__file__), "ai_last_response.json")
             try:
-                existing: List[Dict[str, Any]] = []
-                if os.path.exists(debug_path):
-                    try:
-                        with open(debug_path, "r", encoding="utf-8") as rf:
-                            existing_data = json.load(rf)
-                            if isinstance(existing_data, list):
-                                existing = existing_data
-                    except Exception:
-                        existing = []
-                existing.append({
+                await asyncio.to_thread(_append_ai_debug, {
                     "title": title,
                     "preview_body": body[:500],
                     "raw": content,
                     "api": {"base_url": base_url, "model": model},
                     "created_at": _now().isoformat(),
                 })
-                with open(debug_path, "w", encoding="utf-8") as f:
-                    json.dump(existing[-200:], f, ensure_ascii=False, indent=2)
             except Exception as werr:
                 logger.warning(f"[XJEdu] 写入 AI 调试文件失败: {werr}")
             # 尝试解析 JSON
             try:
-                import json as _json
-
                 text = content.strip()
                 # 截取可能的代码块
                 if text.startswith("```"):
                     text = text.strip("`")
                     text = text.split("\n", 1)[-1]
-                parsed = _json.loads(text)
+                parsed = _json_loads(text)
             except Exception:
                 logger.warning(f"[XJEdu] AI 返回无法解析，内容={content[:200]}")
                 return None
@@ -346,6 +599,26 @@ class XJEduPlugin(Star):
             logger.warning(f"[XJEdu] AI 请求异常: {type(e).__name__}: {e}")
             return None
 
+    async def _post_ai(self, url: str, payload: Dict[str, Any]) -> Optional[bytes]:
+        async with self._get_http().post(url, json=payload, headers=self._ai_headers, timeout=AI_TIMEOUT) as resp:
+            if resp.status != 200:
+                try:
+                    resp_text = await resp.text(errors="ignore")
+                except Exception:
+                    resp_text = ""
+                logger.warning(f"[XJEdu] AI 解析失败 status={resp.status} url={url} resp={resp_text[:300]}")
+                return None
+            if (resp.content_length or 0) > AI_MAX_RESP_BYTES:
+                logger.warning(f"[XJEdu] AI 响应过大 length={resp.content_length}，已跳过")
+                return None
+            buf = bytearray()
+            async for chunk in resp.content.iter_chunked(65536):
+                buf += chunk
+                if len(buf) > AI_MAX_RESP_BYTES:
+                    logger.warning("[XJEdu] AI 响应超过大小上限，已跳过")
+                    return None
+            return bytes(buf)
+
     async def _load_store_file(self):
         if self.store_loaded:
             return
@@ -353,8 +626,7 @@ class XJEduPlugin(Star):
             self.store_loaded = True
             return
         try:
-            with open(STORE_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = await asyncio.to_thread(_read_json, STORE_PATH)
             last_ids = data.get("last_seen_ids", [])
             kb = data.get("competitions", [])
             if last_ids:
@@ -369,32 +641,62 @@ class XJEduPlugin(Star):
 
     async def _save_store_file(self):
         try:
+            state = await self._load_state()
             data = {
-                "last_seen_ids": await self._get_kv("last_seen_ids", []),
-                "competitions": await self._get_kv("competitions", []),
-                "errors": await self._get_kv("errors", []),
+                "last_seen_ids": state["last_seen_ids"],
+                "competitions": list(state["competitions"].values()),
+                "errors": state["errors"],
             }
-            with open(STORE_PATH, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            await asyncio.to_thread(_write_json, STORE_PATH, data)
         except Exception as e:
             logger.warning(f"[XJEdu] 写入外置存储失败: {e}")
 
+    async def _load_state(self) -> Dict[str, Any]:
+        if self._state_loaded:
+            return self._state
+        # 旧版链接拼接只去掉一层 ../，会留下 https://due.xjtu.edu.cn/../info/... 形式的 id；
+        # 按 urljoin 规则归一，避免已推送的通知被当作新通知
+        old_prefix = DUE_ROOT + "../"
+        self._state = {
+            "last_seen_ids": [
+                urljoin(DUE_ROOT, i[len(DUE_ROOT):]) if i.startswith(old_prefix) else i
+                for i in await self._get_kv("last_seen_ids", [])
+            ],
+            # 订阅会话用集合保存，订阅/退订的成员判断与增删均为 O(1)
+            "subscribers": set(await self._get_kv("subscribers", [])),
+            # 以 id 为键的知识库映射，去重更新为 O(1)
+            "competitions": {k.get("id"): k for k in await self._get_kv("competitions", [])},
+            "errors": await self._get_kv("errors", []),
+        }
+        self._state_loaded = True
+        return self._state
+
+    async def _flush_state(self):
+        # 一次性回写 KV 与外置文件
+        state = await self._load_state()
+        # 原地截断：检查流程在 await 期间持有这些列表的引用，重新绑定会让其后续追加丢失
+        del state["last_seen_ids"][:-200]
+        del state["errors"][:-200]
+        await self._save_kv("last_seen_ids", state["last_seen_ids"])
+        await self._save_kv("competitions", list(state["competitions"].values()))
+        await self._save_kv("errors", state["errors"])
+        await self._save_store_file()
+
     async def _initial_sync(self):
         try:
             items = await self._fetch_competition_list()
             if not items:
                 return
-            last_ids: List[str] = await self._get_kv("last_seen_ids", [])
-            kb: List[Dict[str, Any]] = await self._get_kv("competitions", [])
-            updated = False
-            for it in items:
-                if it["id"] in last_ids:
-                    continue
-                detail = await self._fetch_detail(it.get("url", "")) if it.get("url") else {}
+            state = await self._load_state()
+            last_ids: List[str] = state["last_seen_ids"]
+            seen = set(last_ids)
+            kb: Dict[str, Dict[str, Any]] = state["competitions"]
+            errors: List[Dict[str, Any]] = state["errors"]
+            pending = [it for it in items if it["id"] not in seen]
+            results = await self._fetch_and_extract_all(pending)
+            for it, (detail, ai_res) in zip(pending, results):
                 title = it.get("title", "")
                 body = detail.get("body", "")
-                raw_html = detail.get("html", "")
-                ai_res = await self._ai_extract_competition(title, body, raw_html)
                 if not ai_res:
                     continue
                 is_reg = bool(ai_res.get("is_registration", False))
@@ -415,24 +717,18 @@ class XJEduPlugin(Star):
                     "is_registration": is_reg,
                     "start_date": tw["start"].isoformat() if tw["start"] else None,
                     "end_date": tw["end"].isoformat() if tw["end"] else None,
+                    # 缓存截止日的序数，提醒时直接整数相减得到剩余天数
+                    "_end_ord": tw["end"].toordinal() if tw["end"] else None,
                     "qq_group": qq,
                     "created_at": _now().isoformat(),
                     "last_remind": None,
                 }
                 # 错误目录：若为报名但开始与截止日期相同或截止早于开始，计入错误目录
                 try:
-                    errors: List[Dict[str, Any]] = await self._get_kv("errors", [])
                     sd = comp.get("start_date")
                     ed = comp.get("end_date")
-                    def _d(s: Optional[str]) -> Optional[datetime]:
-                        try:
-                            return datetime.fromisoformat(s) if s else None
-                        except Exception:
-                            return None
-                    sdt = _d(sd)
-                    edt = _d(ed)
                     same_day = (sd and ed and sd[:10] == ed[:10])
-                    end_before_start = (sdt and edt and edt < sdt)
+                    end_before_start = (tw["start"] and tw["end"] and tw["end"] < tw["start"])
                     if comp.get("is_registration") and (same_day or end_before_start):
                         errors.append({
                             "id": comp["id"],
@@ -443,23 +739,39 @@ class XJEduPlugin(Star):
                             "end_date": ed,
                             "created_at": _now().isoformat(),
                         })
-                        await self._save_kv("errors", errors[-200:])
                 except Exception:
                     pass
                 if is_reg and tw["end"] and tw["end"] > _now():
-                    kb = [k for k in kb if k.get("id") != comp["id"]]
-                    kb.append(comp)
-                    updated = True
+                    kb.pop(comp["id"], None)
+                    kb[comp["id"]] = comp
                 last_ids.append(it["id"])
-            if last_ids:
-                await self._save_kv("last_seen_ids", last_ids[-200:])
-            if updated:
-                await self._save_kv("competitions", kb)
-                await self._save_store_file()
+            await self._flush_state()
             logger.info("[XJEdu] 初始同步完成，补充知识库")
         except Exception as e:
             logger.warning(f"[XJEdu] 初始同步异常: {e}")
 
+    async def _fetch_and_extract(self, it: Dict[str, Any], sem: asyncio.Semaphore):
+        async with sem:
+            detail = await self._fetch_detail(it["url"]) if it.get("url") else {}
+            ai_res = await self._ai_extract_competition(
+                it.get("title", ""), detail.get("body", ""), detail.get("html", "")
+            )
+        return detail, ai_res
+
+    async def _fetch_and_extract_all(self, items: List[Dict[str, Any]]) -> List[tuple]:
+        # 各条通知的详情抓取与 AI 解析互相独立，限流并发执行；结果顺序与 items 一致
+        sem = asyncio.Semaphore(DETAIL_CONCURRENCY)
+        results = await asyncio.gather(
+            *(self._fetch_and_extract(it, sem) for it in items), return_exceptions=True
+        )
+        out: List[tuple] = []
+        for it, r in zip(items, results):
+            if isinstance(r, BaseException):
+                logger.warning(f"[XJEdu] 详情处理异常 {it.get('url')}: {r}")
+                r = ({}, None)
+            out.append(r)
+        return out
+
     async def _periodic_check_loop(self, interval_sec: int):
         while self._running:
             try:
@@ -469,35 +781,38 @@ class XJEduPlugin(Star):
             await asyncio.sleep(interval_sec)
 
     async def _daily_deadline_remind_loop(self, hour: int = 9):
-        # 每分钟检查一次是否到点，避免阻塞
+        # 直接休眠到下一个整点提醒时刻，触发后顺延一天
+        target = _now().replace(hour=hour, minute=0, second=0, microsecond=0)
         while self._running:
+            # 以目标时刻推进而非重新取整，避免提前几毫秒醒来时同一天重复触发
+            while target <= _now():
+                target += timedelta(days=1)
+            await asyncio.sleep((target - _now()).total_seconds())
             try:
-                now = _now()
-                if now.hour == hour and now.minute in (0, 1):
-                    await self._send_deadline_reminders(days_threshold=3)
-                    await asyncio.sleep(120)
+                await self._send_deadline_reminders(days_threshold=3)
             except Exception as e:
                 logger.warning(f"[XJEdu] 截止提醒异常: {e}")
-            await asyncio.sleep(60)
+            target += timedelta(days=1)
 
     async def _check_and_push(self):
         items = await self._fetch_competition_list()
         if not items:
             return
-        last_ids: List[str] = await self._get_kv("last_seen_ids", [])
-        subscribers: List[str] = await self._get_kv("subscribers", [])
-        kb: List[Dict[str, Any]] = await self._get_kv("competitions", [])
-
-        new_items = [i for i in items if i["id"] not in last_ids]
+        state = await self._load_state()
+        last_ids: List[str] = state["last_seen_ids"]
+        subscribers: Set[str] = state["subscribers"]
+        kb: Dict[str, Dict[str, Any]] = state["competitions"]
+        errors: List[Dict[str, Any]] = state["errors"]
+
+        seen = set(last_ids)
+        new_items = [i for i in items if i["id"] not in seen]
         if not new_items:
             return
 
-        for it in new_items:
-            detail = await self._fetch_detail(it["url"]) if it.get("url") else {}
+        results = await self._fetch_and_extract_all(new_items)
+        for it, (detail, ai_res) in zip(new_items, results):
             title = it.get("title", "")
             body = detail.get("body", "")
-            raw_html = detail.get("html", "")
-            ai_res = await self._ai_extract_competition(title, body, raw_html)
             if not ai_res:
                 continue
             is_reg = bool(ai_res.get("is_registration", False))
@@ -519,24 +834,18 @@ class XJEduPlugin(Star):
                 "is_registration": is_reg,
                 "start_date": tw["start"].isoformat() if tw["start"] else None,
                 "end_date": tw["end"].isoformat() if tw["end"] else None,
+                # 缓存截止日的序数，提醒时直接整数相减得到剩余天数
+                "_end_ord": tw["end"].toordinal() if tw["end"] else None,
                 "qq_group": qq,
                 "created_at": _now().isoformat(),
                 "last_remind": None,
             }
             # 错误目录：若为报名但开始与截止日期相同或截止早于开始，计入错误目录
             try:
-                errors: List[Dict[str, Any]] = await self._get_kv("errors", [])
                 sd = comp.get("start_date")
                 ed = comp.get("end_date")
-                def _d(s: Optional[str]) -> Optional[datetime]:
-                    try:
-                        return datetime.fromisoformat(s) if s else None
-                    except Exception:
-                        return None
-                sdt = _d(sd)
-                edt = _d(ed)
                 same_day = (sd and ed and sd[:10] == ed[:10])
-                end_before_start = (sdt and edt and edt < sdt)
+                end_before_start = (tw["start"] and tw["end"] and tw["end"] < tw["start"])
                 if comp.get("is_registration") and (same_day or end_before_start):
                     errors.append({
                         "id": comp["id"],
@@ -547,14 +856,13 @@ class XJEduPlugin(Star):
                         "end_date": ed,
                         "created_at": _now().isoformat(),
                     })
-                    await self._save_kv("errors", errors[-200:])
             except Exception:
                 pass
             # 更新知识库：若为报名且尚处在报名阶段，加入KB
             if is_reg and ((tw["end"] and tw["end"] > _now()) or tw["end"] is None):
                 # 去重更新
-                kb = [k for k in kb if k.get("id") != comp["id"]]
-                kb.append(comp)
+                kb.pop(comp["id"], None)
+                kb[comp["id"]] = comp
             else:
                 pass
 
@@ -565,11 +873,9 @@ class XJEduPlugin(Star):
 
         # 更新 last_seen 与 KB
         last_ids.extend([i["id"] for i in new_items])
-        await self._save_kv("last_seen_ids", last_ids[-200:])
-        await self._save_kv("competitions", kb)
-        await self._save_store_file()
+        await self._flush_state()
 
-    async def _broadcast_competition(self, comp: Dict[str, Any], subscribers: List[str]):
+    async def _broadcast_competition(self, comp: Dict[str, Any], subscribers: Iterable[str]):
         # 仅推送报名类信息，非报名通知直接跳过
         if not comp.get("is_registration"):
             return
@@ -588,88 +894,93 @@ class XJEduPlugin(Star):
         msg = self._persona_wrap("\n".join(lines))
 
         chain = MessageChain().message(msg)
-        for sess in subscribers:
-            try:
-                await self.context.send_message(sess, chain)
-            except Exception as e:
-                logger.warning(f"[XJEdu] 推送失败 {sess}: {e}")
+        await self._send_to_all(subscribers, chain, "推送失败")
+
+    async def _send_to_all(self, subscribers: Iterable[str], chain: MessageChain, fail_tag: str):
+        # 并发发送给全部订阅者，单个会话失败或较慢不影响其他会话
+        # 先固定一份列表：发送期间可能有人订阅/退订，结果需与会话一一对应
+        targets = list(subscribers)
+        results = await asyncio.gather(
+            *(self.context.send_message(sess, chain) for sess in targets), return_exceptions=True
+        )
+        for sess, r in zip(targets, results):
+            if isinstance(r, BaseException):
+                logger.warning(f"[XJEdu] {fail_tag} {sess}: {r}")
 
     async def _send_deadline_reminders(self, days_threshold: int = 3):
-        subscribers: List[str] = await self._get_kv("subscribers", [])
-        kb: List[Dict[str, Any]] = await self._get_kv("competitions", [])
+        state = await self._load_state()
+        subscribers: Set[str] = state["subscribers"]
+        kb: Dict[str, Dict[str, Any]] = state["competitions"]
         if not kb or not subscribers:
             return
         now = _now()
-        for comp in kb:
-            ed = comp.get("end_date")
-            if not ed:
-                continue
-            try:
-                end_dt = datetime.fromisoformat(ed)
-            except Exception:
-                continue
-            days_left = (end_dt.date() - now.date()).days
+        today_ord = now.toordinal()
+        today_iso = now.date().isoformat()
+        # 遍历快照：发送期间检查任务可能增删知识库条目
+        for comp in list(kb.values()):
+            end_ord = comp.get("_end_ord")
+            if end_ord is None:
+                # 兼容旧记录：首次解析后回填序数
+                ed = comp.get("end_date")
+                if not ed:
+                    continue
+                try:
+                    end_ord = comp["_end_ord"] = datetime.fromisoformat(ed).toordinal()
+                except Exception:
+                    continue
+            days_left = end_ord - today_ord
             if 0 <= days_left <= days_threshold:
                 # 防重推：同一天只推一次
                 last_remind = comp.get("last_remind")
-                if last_remind and last_remind[:10] == now.date().isoformat():
+                if last_remind and last_remind[:10] == today_iso:
                     continue
                 msg = (
                     f"【报名提醒】{comp.get('title','')}\n"
-                    f"报名截至：{end_dt.date().isoformat()}\n"
+                    f"报名截至：{date.fromordinal(end_ord).isoformat()}\n"
                     f"剩余天数：{days_left}天"
                 )
                 chain = MessageChain().message(self._persona_wrap(msg))
-                for sess in subscribers:
-                    try:
-                        await self.context.send_message(sess, chain)
-                    except Exception as e:
-                        logger.warning(f"[XJEdu] 截止提醒失败 {sess}: {e}")
+                await self._send_to_all(subscribers, chain, "截止提醒失败")
                 comp["last_remind"] = now.isoformat()
-        await self._save_kv("competitions", kb)
-        await self._save_store_file()
+        await self._flush_state()
 
     async def _fetch_html(self, url: str) -> str:
         if not aiohttp:
             return ""
         # 支持从环境变量读取代理，提升通过率
         proxy = os.getenv("ASTRBOT_HTTP_PROXY") or os.getenv("HTTP_PROXY")
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36",
-            "Accept-Language": "zh-CN,zh;q=0.9",
-            "Referer": "https://due.xjtu.edu.cn/",
-        }
-        async with aiohttp.ClientSession(headers=headers) as sess:
-            try:
-                async with sess.get(url, timeout=20, proxy=proxy) as resp:
-                    text = await resp.text(errors="ignore")
-                    # 站点可能有JS动态验证，若检测到challenge则尝试浏览器渲染兜底
-                    if "dynamic_challenge" in text or resp.status in (403, 429):
-                        if not self._challenge_warned:
-                            preview = text[:200].replace("\n", " ")
-                            logger.warning(
-                                f"[XJEdu] 遇到动态挑战或限流，尝试使用 Playwright 渲染。status={resp.status} preview={preview}"
-                            )
-                            self._challenge_warned = True
-                        rendered = await self._fetch_html_playwright(url, proxy)
-                        return rendered or ""
-                    return text
-            except Exception as e:
-                logger.exception(f"[XJEdu] 抓取失败: {e}")
-                return ""
+        try:
+            async with self._get_http().get(
+                url, timeout=20, proxy=proxy, headers={"Referer": DUE_ROOT}
+            ) as resp:
+                # 直接按声明的编码解码，避免对整页做字符集探测
+                text = _decode_html(await resp.read(), resp.charset)
+                # 站点可能有JS动态验证，若检测到challenge则尝试浏览器渲染兜底
+                if "dynamic_challenge" in text or resp.status in (403, 429):
+                    if not self._challenge_warned:
+                        preview = text[:200].replace("\n", " ")
+                        logger.warning(
+                            f"[XJEdu] 遇到动态挑战或限流，尝试使用 Playwright 渲染。status={resp.status} preview={preview}"
+                        )
+                        self._challenge_warned = True
+                    rendered = await self._fetch_html_playwright(url, proxy)
+                    return rendered or ""
+                return text
+        except Exception as e:
+            logger.exception(f"[XJEdu] 抓取失败: {e}")
+            return ""
 
     async def _fetch_html_playwright(self, url: str, proxy: Optional[str] = None) -> str:
         if not async_playwright:
             logger.warning("[XJEdu] Playwright 未安装，无法执行动态渲染。可通过 pip install playwright && playwright install chromium 安装。")
             return ""
+        browser = None
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True, proxy={"server": proxy} if proxy else None)
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36",
-                    locale="zh-CN",
-                )
-                page = await context.new_page()
+            ctx = await self._ensure_browser(proxy)
+            # 记下本次使用的浏览器，出错时只在它仍是当前实例时才回收
+            browser = self._browser
+            page = await ctx.new_page()
+            try:
                 await page.goto(url, wait_until="networkidle", timeout=20000)
                 # 等待页面执行挑战与跳转，适度等待即可
                 await page.wait_for_timeout(4000)
@@ -678,30 +989,73 @@ class XJEduPlugin(Star):
                 if "dynamic_challenge" in content or "安全检查" in content:
                     await page.wait_for_timeout(4000)
                     content = await page.content()
-                # 首次渲染落盘，便于人工检查结构
-                if not self._render_dumped:
-                    dump_path = os.path.join(os.path.dirname(__file__), "debug_rendered.html")
-                    try:
-                        with open(dump_path, "w", encoding="utf-8", errors="ignore") as f:
-                            f.write(content)
-                    except Exception as dump_err:
-                        logger.warning(f"[XJEdu] 渲染结果落盘失败: {dump_err}")
-                    self._render_dumped = True
-                await browser.close()
-                return content
+            finally:
+                await page.close()
+            # 首次渲染落盘，便于人工检查结构
+            if not self._render_dumped:
+                dump_path = os.path.join(os.path.dirname(__file__), "debug_rendered.html")
+                try:
+                    await asyncio.to_thread(_write_text, dump_path, content)
+                except Exception as dump_err:
+                    logger.warning(f"[XJEdu] 渲染结果落盘失败: {dump_err}")
+                self._render_dumped = True
+            return content
         except Exception as e:
             logger.exception(f"[XJEdu] Playwright 渲染失败: {e}")
+            # 页面级错误（如导航超时）只影响本页；浏览器本身断开时才回收，
+            # 且不能关掉其他协程已重新启动的新实例
+            if browser is not None:
+                await self._close_browser_if_dead(browser)
             return ""
 
+    async def _ensure_browser(self, proxy: Optional[str] = None):
+        # 惰性启动浏览器与上下文；代理变化或浏览器断开时重建
+        async with self._browser_lock:
+            if self._browser_ctx is not None and self._browser_proxy == proxy and self._browser.is_connected():
+                return self._browser_ctx
+            await self._close_browser_unlocked()
+            self._pw = await async_playwright().start()
+            self._browser = await self._pw.chromium.launch(headless=True, proxy={"server": proxy} if proxy else None)
+            self._browser_ctx = await self._browser.new_context(
+                user_agent=USER_AGENT,
+                locale="zh-CN",
+            )
+            self._browser_proxy = proxy
+            return self._browser_ctx
+
+    async def _close_browser(self):
+        async with self._browser_lock:
+            await self._close_browser_unlocked()
+
+    async def _close_browser_if_dead(self, browser):
+        async with self._browser_lock:
+            if self._browser is browser and not browser.is_connected():
+                await self._close_browser_unlocked()
+
+    async def _close_browser_unlocked(self):
+        for closer in (self._browser_ctx, self._browser):
+            if closer is not None:
+                try:
+                    await closer.close()
+                except Exception:
+                    pass
+        if self._pw is not None:
+            try:
+                await self._pw.stop()
+            except Exception:
+                pass
+        self._pw = None
+        self._browser = None
+        self._browser_ctx = None
+
     async def _fetch_competition_list(self) -> List[Dict[str, Any]]:
         # 多入口抓取 + 本地回退
         html_list: List[tuple[str, str]] = []
-        main_html = await self._fetch_html(DUE_LIST_URL)
-        if main_html:
-            html_list.append((main_html, DUE_LIST_URL))
-        for u in DUE_LIST_EXTRA:
-            h = await self._fetch_html(u)
-            if h:
+        urls = [DUE_LIST_URL, *DUE_LIST_EXTRA]
+        htmls = await asyncio.gather(*(self._fetch_html(u) for u in urls), return_exceptions=True)
+        main_html = htmls[0] if isinstance(htmls[0], str) else ""
+        for u, h in zip(urls, htmls):
+            if isinstance(h, str) and h:
                 html_list.append((h, u))
 
         # 本地回退：同目录 source_code.html 或环境变量 ASTRBOT_XJTU_FALLBACK_HTML 指向的文件
@@ -709,18 +1063,20 @@ class XJEduPlugin(Star):
             local_path = os.getenv("ASTRBOT_XJTU_FALLBACK_HTML") or os.path.join(os.path.dirname(__file__), "source_code.html")
             if os.path.exists(local_path):
                 try:
-                    with open(local_path, "r", encoding="utf-8", errors="ignore") as f:
-                        html_list.append((f.read(), "file://fallback"))
+                    html_list.append((await asyncio.to_thread(_read_text, local_path), "file://fallback"))
                     logger.info(f"[XJEdu] 使用本地HTML回退: {local_path}")
                 except Exception as e:
                     logger.warning(f"[XJEdu] 读取本地回退HTML失败: {e}")
 
         items: Dict[str, Dict[str, Any]] = {}
-        if not BeautifulSoup:
+        if not BeautifulSoup and lxml_html is None:
             return []
 
-        for html, base in html_list:
-            parsed = self._parse_list_html(html, base)
+        # HTML 解析是纯 CPU 工作，放到线程中执行，避免阻塞同一事件循环上的其他任务
+        parsed_pages = await asyncio.gather(
+            *(asyncio.to_thread(self._parse_list_html, html, base) for html, base in html_list)
+        )
+        for parsed in parsed_pages:
             for it in parsed:
                 items[it["id"]] = it
 
@@ -729,20 +1085,29 @@ class XJEduPlugin(Star):
         return list(items.values())
 
     def _parse_list_html(self, html: str, base_url: str) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(html, "html.parser")
+        if lxml_html is not None:
+            try:
+                return self._parse_list_html_lxml(html, base_url)
+            except Exception as e:
+                logger.warning(f"[XJEdu] lxml 解析列表失败，回退 BeautifulSoup: {e}")
+        if not BeautifulSoup:
+            return []
+        # 只构建 ul 与 a 子树，列表解析与兜底链接扫描都只用得到这两类节点
+        soup = BeautifulSoup(html, BS_PARSER, parse_only=SoupStrainer(["ul", "a"]))
         found: List[Dict[str, Any]] = []
+        normalize = self._normalize_url
         # 优先解析列表 ul.list li a span
-        for li in soup.select("ul.list li"):
+        list_items = _LIST_ITEM_SELECTOR.select(soup) if _LIST_ITEM_SELECTOR is not None else soup.select("ul.list li")
+        for li in list_items:
             a = li.find("a")
             date_span = li.find("span")
             if not a or not a.get("href"):
                 continue
             title = (a.get_text() or "").strip()
             href = a.get("href").strip()
-            # 过滤关键词，放宽到含 竞赛/比赛/报名/竞赛大创/竞赛安排
-            if not any(k in title for k in ["竞赛", "比赛", "报名", "大创", "赛"]):
+            if not _LIST_TITLE_RE.search(title):
                 continue
-            url = href if href.startswith("http") else self._normalize_url(base_url, href)
+            url = normalize(base_url, href)
             post_time = (date_span.get_text() or "").strip() if date_span else None
             found.append({
                 "id": url,
@@ -757,9 +1122,49 @@ class XJEduPlugin(Star):
                 href = a["href"].strip()
                 if not title:
                     continue
-                if not any(k in title for k in ["竞赛", "比赛", "报名", "大创", "赛"]):
+                if not _LIST_TITLE_RE.search(title):
+                    continue
+                url = normalize(base_url, href)
+                found.append({
+                    "id": url,
+                    "title": title,
+                    "url": url,
+                    "post_time": None,
+                })
+        return found
+
+    def _parse_list_html_lxml(self, html: str, base_url: str) -> List[Dict[str, Any]]:
+        # 与 BeautifulSoup 版本逻辑一致，改用 lxml 的 XPath 定位
+        doc = lxml_html.fromstring(_XML_DECL_RE.sub("", html, count=1))
+        found: List[Dict[str, Any]] = []
+        normalize = self._normalize_url
+        for li in doc.xpath('//ul[contains(concat(" ", normalize-space(@class), " "), " list ")]//li'):
+            a = next(iter(li.iter("a")), None)
+            date_span = next(iter(li.iter("span")), None)
+            if a is None or not a.get("href"):
+                continue
+            title = (a.text_content() or "").strip()
+            href = a.get("href").strip()
+            if not _LIST_TITLE_RE.search(title):
+                continue
+            url = normalize(base_url, href)
+            post_time = (date_span.text_content() or "").strip() if date_span is not None else None
+            found.append({
+                "id": url,
+                "title": title,
+                "url": url,
+                "post_time": post_time,
+            })
+        # 兜底：全局链接扫描
+        if not found:
+            for a in doc.xpath("//a[@href]"):
+                title = (a.text_content() or "").strip()
+                href = a.get("href").strip()
+                if not title:
+                    continue
+                if not _LIST_TITLE_RE.search(title):
                     continue
-                url = href if href.startswith("http") else self._normalize_url(base_url, href)
+                url = normalize(base_url, href)
                 found.append({
                     "id": url,
                     "title": title,
@@ -769,63 +1174,66 @@ class XJEduPlugin(Star):
         return found
 
     def _normalize_url(self, base_url: str, href: str) -> str:
-        if href.startswith("http"):
-            return href
-        if href.startswith("../"):
-            # 去掉 ../
-            href = href[3:]
-        if href.startswith("./"):
-            href = href[2:]
-        # 基础域
-        if base_url.startswith("http"):
-            root = "https://due.xjtu.edu.cn/"
-            return root + href.lstrip("/")
-        return href
+        # 按浏览器规则相对列表页解析链接（含多级 ../ 与绝对链接）；本地回退页以站点根为基准
+        return urljoin(base_url if base_url.startswith("http") else DUE_ROOT, href)
 
     async def _fetch_detail(self, url: str) -> Dict[str, Any]:
         html = await self._fetch_html(url)
         if not html or not BeautifulSoup:
             return {"body": "", "html": html or ""}
-        soup = BeautifulSoup(html, "html.parser")
-        # 优先从正文容器抽取
-        candidates = []
-        selectors = [
-            "div#ny-main", "div.ny", "div#vsb_content", "div#vsb_content_2",
-            "div#vsb_content_4", "div#vsb_content_5", "div.article", "div.content",
-            "div.news-content"
-        ]
-        for sel in selectors:
-            candidates.extend(soup.select(sel))
+        return await asyncio.to_thread(self._parse_detail_html, html)
+
+    def _parse_detail_html(self, html: str) -> Dict[str, Any]:
+        # 优先从正文容器抽取：先按 id、再按 class 只构建候选 div 子树，取其中最长的正文；
+        # 都没有时才解析整页
         best_text = ""
-        for el in candidates:
-            t = el.get_text("\n", strip=True)
-            if len(t) > len(best_text):
-                best_text = t
+        for hint_re, strainer in _DETAIL_PASSES:
+            if len(best_text) > DETAIL_ENOUGH_CHARS:
+                break
+            if not hint_re.search(html):
+                continue
+            soup = BeautifulSoup(html, BS_PARSER, parse_only=strainer)
+            # 每类容器只取第一个匹配；正文足够长时直接采用，否则保留最长的一个
+            for tag, attrs in _DETAIL_CONTAINERS:
+                el = soup.find(tag, attrs)
+                if el is None:
+                    continue
+                t = el.get_text("\n", strip=True)
+                if len(t) > len(best_text):
+                    best_text = t
+                if len(best_text) > DETAIL_ENOUGH_CHARS:
+                    break
         if not best_text:
+            # 无正文容器时取整页文本，先去掉脚本、样式与导航
+            soup = BeautifulSoup(html, BS_PARSER)
+            for el in soup(["script", "style", "noscript", "nav", "header", "footer"]):
+                el.decompose()
             best_text = soup.get_text("\n")
         return {"body": best_text, "html": html}
 
     def _extract_relevant_snippet(self, body: str) -> str:
-        lines = [ln.strip() for ln in (body or "").splitlines()]
-        patt_date = re.compile(r"\d{4}[年./-]\d{1,2}[月./-]\d{1,2}")
-        include_kw = ["报名", "报名通知", "报名开始", "报名截止", "参赛", "竞赛", "安排", "截止时间", "开始时间", "报名时间", "发布日期", "发布"]
-        discard_kw = ["当前位置", "上一篇", "下一篇", "打印", "分享", "返回", "阅读", "浏览次数", "来源", "作者"]
+        body = body or ""
         picked = []
-        for ln in lines:
-            if not ln:
-                continue
-            # 排除明显的导航/页眉页脚等无关内容
-            if any(k in ln for k in discard_kw) and not any(k in ln for k in include_kw):
-                continue
-            # 收入包含日期或关键报名词的行
-            if patt_date.search(ln) or any(k in ln for k in include_kw):
-                picked.append(ln)
-            if len(picked) >= 60:
+        pos = 0
+        while len(picked) < 60:
+            m = _SNIPPET_HIT_RE.search(body, pos)
+            if not m:
                 break
-        return "\n".join(picked if picked else lines[:60])
+            start = body.rfind("\n", 0, m.start()) + 1
+            end = body.find("\n", m.end())
+            if end < 0:
+                end = len(body)
+            ln = body[start:end].strip()
+            # 只有日期、没有报名关键词的行，若像导航/页眉页脚等无关内容则排除
+            if _SNIPPET_INCLUDE_RE.search(ln) or not _SNIPPET_DISCARD_RE.search(ln):
+                picked.append(ln)
+            pos = end + 1
+        if picked:
+            return "\n".join(picked)
+        return "\n".join(ln.strip() for ln in body.splitlines()[:60])
 
     async def _send_welcome_with_latest(self):
-        subscribers: List[str] = await self._get_kv("subscribers", [])
+        subscribers: Set[str] = (await self._load_state())["subscribers"]
         if not subscribers:
             return
         items = await self._fetch_competition_list()
@@ -837,12 +1245,8 @@ class XJEduPlugin(Star):
             msg_lines.append(f"- {latest.get('title','')}")
             if latest.get("url"):
                 msg_lines.append(f"  链接：{latest['url']}")
-        chain = MessageChain().message("\n".join(msg_lines))
-        for sess in subscribers:
-            try:
-                await self.context.send_message(sess, MessageChain().message(self._persona_wrap("\n".join(msg_lines))))
-            except Exception as e:
-                logger.warning(f"[XJEdu] 上线问候发送失败 {sess}: {e}")
+        chain = MessageChain().message(self._persona_wrap("\n".join(msg_lines)))
+        await self._send_to_all(subscribers, chain, "上线问候发送失败")
 
     # ==================== 指令组：竞赛（英文短名 comp） ====================
     @filter.command_group("comp")
@@ -853,29 +1257,32 @@ class XJEduPlugin(Star):
     @competition_group.command("sub")
     async def cmd_subscribe(self, event: AstrMessageEvent):
         sess = event.unified_msg_origin
-        subs: List[str] = await self._get_kv("subscribers", [])
+        state = await self._load_state()
+        subs: Set[str] = state["subscribers"]
         if sess in subs:
             yield event.plain_result(self._persona_wrap("已订阅，无需重复操作"))
             return
-        subs.append(sess)
-        await self._save_kv("subscribers", subs)
+        subs.add(sess)
+        await self._save_kv("subscribers", sorted(subs))
         yield event.plain_result(self._persona_wrap("✅ 已订阅竞赛推送"))
 
     @competition_group.command("unsub")
     async def cmd_unsubscribe(self, event: AstrMessageEvent):
         sess = event.unified_msg_origin
-        subs: List[str] = await self._get_kv("subscribers", [])
+        state = await self._load_state()
+        subs: Set[str] = state["subscribers"]
         if sess not in subs:
             yield event.plain_result(self._persona_wrap("未订阅"))
             return
-        subs = [s for s in subs if s != sess]
-        await self._save_kv("subscribers", subs)
+        subs.discard(sess)
+        await self._save_kv("subscribers", sorted(subs))
         yield event.plain_result(self._persona_wrap("✅ 已退订竞赛推送"))
 
     @competition_group.command("list")
     async def cmd_list(self, event: AstrMessageEvent):
-        kb: List[Dict[str, Any]] = await self._get_kv("competitions", [])
-        errors: List[Dict[str, Any]] = await self._get_kv("errors", [])
+        state = await self._load_state()
+        kb: List[Dict[str, Any]] = list(state["competitions"].values())
+        errors: List[Dict[str, Any]] = state["errors"]
         if not kb:
             tip = "📋 当前暂无正在报名的竞赛"
             if errors:
@@ -885,10 +1292,11 @@ class XJEduPlugin(Star):
         lines = ["📋 当前可报名竞赛："]
         if errors:
             lines.append(f"⚠️ 错误目录：{len(errors)} 条（可在本地存储中修复）")
-        kb_sorted = sorted(
-            kb,
-            key=lambda x: x.get("end_date") or "9999-12-31",
-        )
+        # 超出展示上限时只用堆取截止最近的前 N 条，无需整表排序
+        if len(kb) > LIST_MAX_ITEMS:
+            kb_sorted = heapq.nsmallest(LIST_MAX_ITEMS, kb, key=_end_date_key)
+        else:
+            kb_sorted = sorted(kb, key=_end_date_key)
         for c in kb_sorted:
             ed = c.get("end_date")
             title = c.get("title")
@@ -904,6 +1312,8 @@ class XJEduPlugin(Star):
             if c.get("qq_group"):
                 line += f"\n  QQ群: {c['qq_group']}"
             lines.append(line)
+        if len(kb) > LIST_MAX_ITEMS:
+            lines.append(f"……另有 {len(kb) - LIST_MAX_ITEMS} 条截止较晚的竞赛未显示")
         yield event.plain_result(self._persona_wrap("\n".join(lines)))
 
     @competition_group.command("check")
@@ -924,6 +1334,7 @@ class XJEduPlugin(Star):
         if mode in ("on", "off", "开启", "关闭"):
             flag = mode in ("on", "开启")
             await self._save_kv("ai_use", flag)
+            self._ai_enabled_cached = flag
             yield event.plain_result(self._persona_wrap(f"AI 解析已{'开启' if flag else '关闭'}"))
             return
         # 显示当前状态
@@ -959,20 +1370,18 @@ class XJEduPlugin(Star):
             sample_body = "报名时间：2026-02-01 至 2026-02-20。参赛对象为全体本科生。"
             res = await self._ai_extract_competition(sample_title, sample_body)
             if not res:
-                yield event.plain_result(self._persona_wrap("⚠️ AI 请求或解析失败，请查看日志与 ai_last_response.json"))
+                yield event.plain_result(self._persona_wrap("⚠️ AI 请求或解析失败，请查看日志与 ai_last_response.jsonl"))
                 return
             # 保存到文件
-            out_path = os.path.join(os.path.dirname(__file__), "ai_last_response.json")
-            if os.path.exists(out_path):
+            if os.path.exists(AI_DEBUG_PATH):
                 try:
-                    with open(out_path, "r", encoding="utf-8") as f:
-                        preview = f.read()[:200]
+                    preview = (await asyncio.to_thread(_read_ai_debug_last_line))[:200]
                 except Exception:
-                    preview = json.dumps(res, ensure_ascii=False)[:200]
+                    preview = _json_dumps(res).decode("utf-8")[:200]
             else:
-                preview = json.dumps(res, ensure_ascii=False)[:200]
+                preview = _json_dumps(res).decode("utf-8")[:200]
             logger.warning(f"[XJEdu] AI 连通性检测返回: {preview}")
-            yield event.plain_result(self._persona_wrap(f"✅ AI 连通性正常，预览：\n{json.dumps(res, ensure_ascii=False, indent=2)}"))
+            yield event.plain_result(self._persona_wrap(f"✅ AI 连通性正常，预览：\n{_json_dumps(res, indent=True).decode('utf-8')}"))
         except Exception as e:
             yield event.plain_result(self._persona_wrap(f"⚠️ AI 连通性检测异常：{e}"))
 
@@ -980,6 +1389,10 @@ class XJEduPlugin(Star):
     async def cmd_reset(self, event: AstrMessageEvent):
         """清空已读与缓存，方便重新推送测试。"""
         try:
+            state = await self._load_state()
+            state["last_seen_ids"].clear()
+            state["competitions"].clear()
+            state["errors"].clear()
             await self._save_kv("last_seen_ids", [])
             await self._save_kv("competitions", [])
             await self._save_kv("errors", [])
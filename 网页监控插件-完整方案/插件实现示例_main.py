@@ -5,10 +5,16 @@
 
 import asyncio
 import hashlib
+import heapq
+import importlib.util
 import json
 import os
+import re
+import sqlite3
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple, Union
 import uuid
 
 from astrbot.api.star import Context, Star, register
@@ -18,6 +24,37 @@ from astrbot.api.message import MessageChain
 
 import httpx
 
+try:
+    from selectolax.lexbor import LexborHTMLParser  # 可选依赖，C 实现的 HTML 解析
+except ImportError:
+    LexborHTMLParser = None
+
+
+# 安装了 h2 时启用 HTTP/2，同一主机的并发请求可复用一条连接
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# _fetch_url 的返回哨兵：服务器返回 304，页面自上次以来未变
+UNCHANGED = object()
+
+# tasks 表的列，与 WebUpdateTask.to_dict() 的键一致
+TASK_COLUMNS = (
+    "id", "url", "interval", "enabled", "unified_msg_origin", "last_hash",
+    "last_check_time", "created_time", "etag", "last_modified",
+)
+
+# 任务变更后延迟写盘的秒数，期间的多次变更合并为一次写入
+SAVE_DELAY = 1.0
+
+# 流式读取响应体的分块大小
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# 同一批到期任务的最大并发检查数
+MAX_CONCURRENT_CHECKS = 32
+
+_TITLE_RE = re.compile(r'<title>([^<]+)</title>', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+SUMMARY_CHARS = 200
+
 
 # ============================================================================
 # 数据模型
@@ -35,7 +72,9 @@ class WebUpdateTask:
         unified_msg_origin: str = "",
         last_hash: str = "",
         last_check_time: int = 0,
-        created_time: int = 0
+        created_time: int = 0,
+        etag: str = "",
+        last_modified: str = ""
     ):
         self.id = task_id or str(uuid.uuid4())[:8]
         self.url = url
@@ -45,6 +84,9 @@ class WebUpdateTask:
         self.last_hash = last_hash
         self.last_check_time = last_check_time
         self.created_time = created_time or int(datetime.now().timestamp())
+        # 条件请求校验器，来自上一次 200 响应的 ETag / Last-Modified
+        self.etag = etag
+        self.last_modified = last_modified
     
     def to_dict(self) -> dict:
         """序列化为字典"""
@@ -57,6 +99,8 @@ class WebUpdateTask:
             "last_hash": self.last_hash,
             "last_check_time": self.last_check_time,
             "created_time": self.created_time,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
         }
     
     @staticmethod
@@ -71,6 +115,8 @@ class WebUpdateTask:
             last_hash=data.get("last_hash", ""),
             last_check_time=data.get("last_check_time", 0),
             created_time=data.get("created_time", 0),
+            etag=data.get("etag", ""),
+            last_modified=data.get("last_modified", ""),
         )
 
 
@@ -92,7 +138,15 @@ class WebUpdaterPlugin(Star):
         
         # 任务存储
         self.tasks: Dict[str, WebUpdateTask] = {}
-        self.running_tasks: Dict[str, asyncio.Task] = {}
+        
+        # 调度：所有任务共用一个调度循环，按到期时间维护小顶堆
+        # _due 记录每个已调度任务的当前到期时间，堆中与之不符的条目视为过期
+        self._due: Dict[str, float] = {}
+        self._schedule: List[Tuple[float, str]] = []
+        self._wakeup = asyncio.Event()
+        self._scheduler_task: Optional[asyncio.Task] = None
+        self._check_tasks: set = set()
+        self._check_sem = asyncio.Semaphore(MAX_CONCURRENT_CHECKS)
         
         # 数据持久化路径
         self.storage_dir = os.path.join(
@@ -100,11 +154,18 @@ class WebUpdaterPlugin(Star):
             "webupdater"
         )
         os.makedirs(self.storage_dir, exist_ok=True)
+        # 任务按行存入 SQLite，变更时只写对应行；tasks.json 仅用于迁移旧数据
+        self.db_file = os.path.join(self.storage_dir, "tasks.db")
         self.tasks_file = os.path.join(self.storage_dir, "tasks.json")
+        self._db = self._open_db()
+        self._db_lock = threading.Lock()
+        self._dirty_ids: set = set()
+        self._save_task: Optional[asyncio.Task] = None
         
         # HTTP客户端配置
         self.http_timeout = 10
         self.max_retries = 3
+        self._client: Optional[httpx.AsyncClient] = None
     
     # ========================================================================
     # 生命周期方法
@@ -124,6 +185,33 @@ class WebUpdaterPlugin(Star):
                 await self.start_monitoring(task_id)
                 self.logger.info(f"已启动监控任务: {task_id} ({task.url})")
     
+    async def terminate(self):
+        """插件卸载时停止所有监控任务并关闭HTTP客户端"""
+        if self._scheduler_task is not None and not self._scheduler_task.done():
+            self._scheduler_task.cancel()
+            try:
+                await self._scheduler_task
+            except asyncio.CancelledError:
+                pass
+        self._scheduler_task = None
+        for check_task in list(self._check_tasks):
+            check_task.cancel()
+        await asyncio.gather(*self._check_tasks, return_exceptions=True)
+        self._check_tasks.clear()
+        self._due.clear()
+        self._schedule.clear()
+        
+        # 取消等待中的延迟写入，直接落盘
+        if self._save_task is not None and not self._save_task.done():
+            self._save_task.cancel()
+        self._save_task = None
+        await self._flush_tasks()
+        with self._db_lock:
+            self._db.close()
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+    
     # ========================================================================
     # 指令处理
     # ========================================================================
@@ -166,7 +254,7 @@ class WebUpdaterPlugin(Star):
             
             # 保存任务
             self.tasks[task.id] = task
-            self.save_tasks()
+            self._mark_dirty(task.id)
             
             # 启动监控
             await self.start_monitoring(task.id)
@@ -233,7 +321,7 @@ class WebUpdaterPlugin(Star):
             
             # 删除任务
             task = self.tasks.pop(task_id)
-            self.save_tasks()
+            self._mark_dirty(task_id)
             
             yield event.plain_result(f"✅ 已删除任务 `{task_id}`")
             self.logger.info(f"删除监控任务: {task_id}")
@@ -257,7 +345,7 @@ class WebUpdaterPlugin(Star):
             
             # 启用任务
             task.enabled = True
-            self.save_tasks()
+            self._mark_dirty(task_id)
             
             # 启动异步监控
             await self.start_monitoring(task_id)
@@ -284,7 +372,7 @@ class WebUpdaterPlugin(Star):
             
             # 禁用任务
             task.enabled = False
-            self.save_tasks()
+            self._mark_dirty(task_id)
             
             # 停止异步监控
             await self.stop_monitoring(task_id)
@@ -325,100 +413,147 @@ class WebUpdaterPlugin(Star):
     # ========================================================================
     
     async def start_monitoring(self, task_id: str):
-        """启动单个任务的监控"""
-        if task_id in self.running_tasks:
+        """启动单个任务的监控：立即加入调度，随下一批到期任务检查"""
+        if task_id in self._due:
             return
         
-        task = asyncio.create_task(self._monitoring_loop(task_id))
-        self.running_tasks[task_id] = task
+        self._reschedule(task_id, 0)
+        if self._scheduler_task is None or self._scheduler_task.done():
+            self._scheduler_task = asyncio.create_task(self._scheduler_loop())
     
     async def stop_monitoring(self, task_id: str):
         """停止单个任务的监控"""
-        if task_id not in self.running_tasks:
-            return
-        
-        task = self.running_tasks.pop(task_id)
-        task.cancel()
-        
-        try:
-            await task
-        except asyncio.CancelledError:
-            pass
+        if self._due.pop(task_id, None) is not None:
+            self.logger.info(f"监控任务已停止: {task_id}")
     
-    async def _monitoring_loop(self, task_id: str):
-        """后台监控循环"""
-        task = self.tasks[task_id]
-        
+    def _reschedule(self, task_id: str, delay: float):
+        """将任务安排在 delay 秒后检查，并唤醒调度循环"""
+        due = time.monotonic() + delay
+        self._due[task_id] = due
+        heapq.heappush(self._schedule, (due, task_id))
+        self._wakeup.set()
+    
+    async def _scheduler_loop(self):
+        """后台调度循环：取出所有到期任务并各自启动检查，不等待检查完成"""
         while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            due_ids = []
+            while self._schedule and self._schedule[0][0] <= now:
+                due, task_id = heapq.heappop(self._schedule)
+                if self._due.get(task_id) == due:
+                    due_ids.append(task_id)
+            
+            # 每个检查独立运行，由信号量限制并发；慢任务不会拖住其他任务的调度
+            for task_id in due_ids:
+                check_task = asyncio.create_task(self._check_with_sem(task_id))
+                self._check_tasks.add(check_task)
+                check_task.add_done_callback(self._check_tasks.discard)
+            
+            # 等到最早的任务到期，期间有新任务加入时提前醒来
+            timeout = self._schedule[0][0] - now if self._schedule else None
             try:
-                if not task.enabled:
-                    await asyncio.sleep(10)
-                    continue
-                
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _check_with_sem(self, task_id: str):
+        """在并发上限内检查单个任务，完成后安排下一次检查"""
+        task = self.tasks.get(task_id)
+        if task is None or not task.enabled:
+            self._due.pop(task_id, None)
+            return
+        
+        delay = task.interval
+        try:
+            async with self._check_sem:
                 # 检查更新
                 content = await self.check_update(task)
-                
-                # 如果有更新，发送推送
-                if content:
-                    await self._send_update_notification(task, content)
-                
-                # 等待下一次检查
-                await asyncio.sleep(task.interval)
-                
-            except asyncio.CancelledError:
-                self.logger.info(f"监控任务已停止: {task_id}")
-                break
-            except Exception as e:
-                self.logger.error(f"监控异常 [{task_id}]: {e}")
-                await asyncio.sleep(60)  # 异常时等待60秒后重试
+            
+            # 如果有更新，发送推送
+            if content:
+                await self._send_update_notification(task, content)
+        except Exception as e:
+            self.logger.error(f"监控异常 [{task_id}]: {e}")
+            delay = 60  # 异常时等待60秒后重试
+        
+        # 检查期间任务可能已被停止或删除
+        if task_id in self._due and task_id in self.tasks:
+            self._reschedule(task_id, delay)
     
     async def check_update(self, task: WebUpdateTask) -> Optional[str]:
         """检查网页是否更新"""
         try:
-            # 获取网页内容
-            content = await self._fetch_url(task.url)
-            if not content:
+            # 获取网页内容（原始字节）；304 时无需下载和哈希
+            validators = (task.etag, task.last_modified)
+            fetched = await self._fetch_url(task)
+            if fetched is UNCHANGED or not fetched:
                 return None
-            
-            # 计算哈希值
-            content_hash = self._calculate_hash(content)
+            # 哈希值已在接收响应体时边读边算好
+            content, encoding, content_hash = fetched
             
             # 对比是否有更新
             if task.last_hash and task.last_hash == content_hash:
+                if (task.etag, task.last_modified) != validators:
+                    self._mark_dirty(task.id)
                 return None
             
             # 更新记录
             task.last_hash = content_hash
             task.last_check_time = int(datetime.now().timestamp())
-            self.save_tasks()
+            self._mark_dirty(task.id)
             
-            # 返回新内容摘要
-            return self._extract_content_summary(content)
+            # 确认有更新后才解码，返回新内容摘要；解析同样不占用事件循环
+            html = content.decode(encoding, errors="replace")
+            return await asyncio.to_thread(self._extract_content_summary, html)
             
         except Exception as e:
             self.logger.error(f"检查更新失败 [{task.id}]: {e}")
             return None
     
-    async def _fetch_url(self, url: str) -> Optional[str]:
-        """获取URL内容"""
+    def _get_client(self) -> httpx.AsyncClient:
+        """惰性创建所有任务共享的HTTP客户端，复用 TCP/TLS 连接"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=self.http_timeout,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                follow_redirects=True
+            )
+        return self._client
+    
+    async def _fetch_url(self, task: WebUpdateTask) -> Union[None, object, Tuple[bytes, str, str]]:
+        """条件请求获取任务URL内容，返回 (原始字节, 编码, SHA256)；未变化时返回 UNCHANGED"""
+        url = task.url
+        headers = {}
+        if task.etag:
+            headers["If-None-Match"] = task.etag
+        if task.last_modified:
+            headers["If-Modified-Since"] = task.last_modified
+        
+        client = self._get_client()
         for attempt in range(self.max_retries):
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        url,
-                        timeout=self.http_timeout,
-                        follow_redirects=True
-                    )
-                    
-                    if response.status_code == 200:
-                        return response.text
-                    else:
+                async with client.stream("GET", url, headers=headers) as response:
+                    if response.status_code == 304:
+                        return UNCHANGED
+                    if response.status_code != 200:
                         self.logger.warning(
                             f"获取URL失败 [{url}]: "
                             f"状态码 {response.status_code}"
                         )
                         return None
-                        
+                    
+                    # 边接收边哈希，省去读完后对整个页面的第二遍扫描
+                    digest = hashlib.sha256()
+                    buf = bytearray()
+                    async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                        digest.update(chunk)
+                        buf += chunk
+                    
+                    task.etag = response.headers.get("ETag", "")
+                    task.last_modified = response.headers.get("Last-Modified", "")
+                    return bytes(buf), response.encoding or "utf-8", digest.hexdigest()
             except httpx.TimeoutException:
                 self.logger.warning(f"请求超时 [{url}]，正在重试 ({attempt + 1}/{self.max_retries})")
                 if attempt < self.max_retries - 1:
@@ -429,27 +564,33 @@ class WebUpdaterPlugin(Star):
         
         return None
     
-    @staticmethod
-    def _calculate_hash(content: str) -> str:
-        """计算内容的SHA256哈希值"""
-        return hashlib.sha256(content.encode()).hexdigest()
-    
     @staticmethod
     def _extract_content_summary(html: str) -> str:
-        """从HTML提取内容摘要"""
-        # 简单实现：提取标题和前200个字符
-        # 实际应用可以使用BeautifulSoup库进行更精确的提取
-        
-        # 尝试提取title
-        import re
-        title_match = re.search(r'<title>([^<]+)</title>', html, re.IGNORECASE)
-        title = title_match.group(1) if title_match else "（无标题）"
-        
-        # 提取前文本（移除HTML标签）
-        text_content = re.sub(r'<[^>]+>', '', html)
-        summary = text_content[:200].strip()
+        """从HTML提取内容摘要：标题和正文前200个字符"""
+        if LexborHTMLParser is not None:
+            # selectolax 在 C 层遍历 DOM 取文本
+            tree = LexborHTMLParser(html)
+            title_node = tree.css_first("title")
+            title = title_node.text().strip() if title_node else ""
+            body_text = tree.body.text(separator=" ", strip=True) if tree.body else ""
+            summary = body_text[:SUMMARY_CHARS]
+        else:
+            # 回退：正则提取；去标签时只扫描到凑够摘要长度为止，不生成整页副本
+            title_match = _TITLE_RE.search(html)
+            title = title_match.group(1) if title_match else ""
+            parts = []
+            size = pos = 0
+            for tag in _TAG_RE.finditer(html):
+                parts.append(html[pos:tag.start()])
+                size += tag.start() - pos
+                pos = tag.end()
+                if size >= SUMMARY_CHARS:
+                    break
+            else:
+                parts.append(html[pos:])
+            summary = "".join(parts)[:SUMMARY_CHARS].strip()
         
-        return f"📝 标题: {title}\n📄 摘要: {summary}..."
+        return f"📝 标题: {title or '（无标题）'}\n📄 摘要: {summary}..."
     
     async def _send_update_notification(self, task: WebUpdateTask, content: str):
         """发送更新推送通知"""
@@ -483,36 +624,98 @@ class WebUpdaterPlugin(Star):
         """验证URL的有效性"""
         return url.startswith("http://") or url.startswith("https://")
     
+    def _open_db(self) -> sqlite3.Connection:
+        """打开任务数据库：WAL 模式下写入只追加日志，读写互不阻塞"""
+        # 写入在 asyncio.to_thread 的工作线程中执行，访问由 _db_lock 串行化
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id TEXT PRIMARY KEY, url TEXT, interval INT, enabled INT, "
+            "unified_msg_origin TEXT, last_hash TEXT, last_check_time INT, "
+            "created_time INT, etag TEXT, last_modified TEXT)"
+        )
+        return conn
+    
     def load_tasks(self):
-        """从文件加载任务配置"""
+        """从数据库加载任务配置；数据库为空时导入旧版 tasks.json"""
         try:
-            if not os.path.exists(self.tasks_file):
-                self.tasks = {}
-                return
-            
-            with open(self.tasks_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with self._db_lock:
+                rows = self._db.execute("SELECT * FROM tasks").fetchall()
             
             self.tasks = {}
-            for task_data in data.get("tasks", []):
+            for row in rows:
+                task_data = dict(row)
+                task_data["enabled"] = bool(task_data["enabled"])
                 task = WebUpdateTask.from_dict(task_data)
                 self.tasks[task.id] = task
             
+            if not self.tasks and os.path.exists(self.tasks_file):
+                with open(self.tasks_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for task_data in data.get("tasks", []):
+                    task = WebUpdateTask.from_dict(task_data)
+                    self.tasks[task.id] = task
+                # 写入数据库成功后才改名保留，避免任务全部删除后再次导入；
+                # 写入失败时保留 tasks.json，下次启动重新迁移
+                if self.save_tasks():
+                    os.replace(self.tasks_file, self.tasks_file + ".migrated")
+                    self.logger.info(f"已从 tasks.json 迁移 {len(self.tasks)} 个监控任务")
+            
             self.logger.info(f"已加载 {len(self.tasks)} 个监控任务")
             
         except Exception as e:
             self.logger.error(f"加载任务配置失败: {e}")
             self.tasks = {}
     
-    def save_tasks(self):
-        """保存任务配置到文件"""
+    def save_tasks(self) -> bool:
+        """立即将全部任务写入数据库，并删除已不存在的任务；返回是否写入成功"""
+        self._dirty_ids.clear()
         try:
-            data = {
-                "tasks": [task.to_dict() for task in self.tasks.values()]
-            }
-            
-            with open(self.tasks_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
+            rows = [task.to_dict() for task in self.tasks.values()]
+            with self._db_lock, self._db:
+                self._db.execute("DELETE FROM tasks")
+                self._upsert_rows(rows)
+            return True
+        except Exception as e:
+            self.logger.error(f"保存任务配置失败: {e}")
+            return False
+    
+    def _mark_dirty(self, task_id: str):
+        """标记任务已变更（含删除），SAVE_DELAY 秒后统一写盘"""
+        self._dirty_ids.add(task_id)
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._delayed_flush())
+    
+    async def _delayed_flush(self):
+        await asyncio.sleep(SAVE_DELAY)
+        await self._flush_tasks()
+    
+    async def _flush_tasks(self):
+        """只写入有变更的任务行；数据库写入放到线程中执行"""
+        if not self._dirty_ids:
+            return
+        dirty, self._dirty_ids = self._dirty_ids, set()
+        # 在事件循环中生成快照，避免写盘线程读取正在变化的任务
+        rows = [self.tasks[i].to_dict() for i in dirty if i in self.tasks]
+        deleted = [i for i in dirty if i not in self.tasks]
+        try:
+            await asyncio.to_thread(self._write_rows, rows, deleted)
         except Exception as e:
+            self._dirty_ids |= dirty
             self.logger.error(f"保存任务配置失败: {e}")
+    
+    def _write_rows(self, rows: List[dict], deleted: List[str]):
+        """在一个事务内写入变更行并删除已移除的任务"""
+        with self._db_lock, self._db:
+            self._upsert_rows(rows)
+            self._db.executemany("DELETE FROM tasks WHERE id = ?", [(i,) for i in deleted])
+    
+    def _upsert_rows(self, rows: List[dict]):
+        self._db.executemany(
+            f"INSERT OR REPLACE INTO tasks ({', '.join(TASK_COLUMNS)}) "
+            f"VALUES ({', '.join(':' + c for c in TASK_COLUMNS)})",
+            rows
+        )